@@ -5,13 +5,13 @@
 # by a test in test_events.py with a schema checker here.
 #
 # See https://zulip.readthedocs.io/en/latest/subsystems/events-system.html
-import inspect
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from enum import Enum
-from pprint import PrettyPrinter
+from functools import cache
+from types import UnionType
 from typing import cast
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from zerver.lib.event_types import (
     AllowMessageEditingData,
@@ -128,20 +128,31 @@ from zerver.models import Realm, RealmUserDefault, Stream, UserProfile
 from zerver.models.streams import StreamTopicsPolicyEnum
 
 
+@cache
+def get_type_adapter(model: type[BaseModel]) -> TypeAdapter[BaseModel]:
+    # Building a TypeAdapter is expensive relative to using one, so we
+    # build exactly one per model for the lifetime of the process.
+    return TypeAdapter(model)
+
+
+@cache
+def get_allowed_fields(model: type[BaseModel]) -> frozenset[str]:
+    # A pydantic model's fields are fixed once the class is created.
+    return frozenset(model.model_fields)
+
+
+# The sub-payload types validated here are also members of unions in
+# their parent events, where forbidding extra fields would change which
+# union member matches, so they keep an explicit check instead.
 def validate_with_model(data: dict[str, object], model: type[BaseModel]) -> None:
-    allowed_fields = set(model.model_fields.keys())
-    if not set(data.keys()).issubset(allowed_fields):  # nocoverage
-        raise ValueError(f"Extra fields not allowed: {set(data.keys()) - allowed_fields}")
+    allowed_fields = get_allowed_fields(model)
+    if not data.keys() <= allowed_fields:  # nocoverage
+        raise ValueError(f"Extra fields not allowed: {data.keys() - allowed_fields}")
 
-    model.model_validate(data, strict=True)
+    get_type_adapter(model).validate_python(data, strict=True)
 
 
-def make_checker(base_model: type[BaseEvent]) -> Callable[[str, dict[str, object]], None]:
-    def f(label: str, event: dict[str, object]) -> None:
-        try:
-            validate_with_model(event, base_model)
-        except Exception as e:  # nocoverage
-            print(f"""
+CHECKER_FAILURE_MESSAGE = """
 FAILURE:
 
 The event below fails the check to make sure it has the
@@ -158,8 +169,21 @@ changes that you have made:
 A traceback should follow to help you debug this problem.
 
 Here is the event:
-""")
+"""
+
 
+def make_checker(base_model: type[BaseEvent]) -> Callable[[str, dict[str, object]], None]:
+    adapter = get_type_adapter(base_model)
+
+    def f(label: str, event: dict[str, object]) -> None:
+        try:
+            # BaseEvent forbids extra fields, so this also rejects
+            # any keys not declared on the event type.
+            adapter.validate_python(event, strict=True)
+        except Exception as e:  # nocoverage
+            from pprint import PrettyPrinter
+
+            print(CHECKER_FAILURE_MESSAGE.format(label=label, base_model=base_model))
             PrettyPrinter(indent=4).pprint(event)
             raise e
 
@@ -281,6 +305,42 @@ PERSON_TYPES: dict[str, type[BaseModel]] = dict(
 )
 
 
+def split_enum_property_types(
+    property_types: Mapping[str, type | UnionType],
+) -> tuple[dict[str, type[Enum]], dict[str, type | UnionType]]:
+    enum_types: dict[str, type[Enum]] = {}
+    other_types: dict[str, type | UnionType] = {}
+    for name, property_type in property_types.items():
+        if isinstance(property_type, type) and issubclass(property_type, Enum):
+            enum_types[name] = property_type
+        else:
+            other_types[name] = property_type
+    return enum_types, other_types
+
+
+REALM_ENUM_PROPERTY_TYPES, REALM_OTHER_PROPERTY_TYPES = split_enum_property_types(
+    Realm.property_types
+)
+REALM_DEFAULT_ENUM_PROPERTY_TYPES, REALM_DEFAULT_OTHER_PROPERTY_TYPES = split_enum_property_types(
+    RealmUserDefault.property_types
+)
+USER_ENUM_PROPERTY_TYPES, USER_OTHER_PROPERTY_TYPES = split_enum_property_types(
+    UserProfile.property_types
+)
+
+# Realm properties that are sent as integer ids rather than being
+# typed via Realm.property_types.
+REALM_INT_PROPERTIES = frozenset(
+    {
+        "moderation_request_channel_id",
+        "new_stream_announcements_stream_id",
+        "signup_announcements_stream_id",
+        "zulip_update_announcements_stream_id",
+        "org_type",
+    }
+)
+
+
 def check_channel_folder_update(var_name: str, event: dict[str, object], fields: set[str]) -> None:
     _check_channel_folder_update(var_name, event)
 
@@ -335,9 +395,10 @@ def check_muted_topics(
     _check_muted_topics(var_name, event)
     muted_topics = event["muted_topics"]
     assert isinstance(muted_topics, list)
-    for muted_topic in muted_topics:
-        muted_topic_tuple = tuple(muted_topic)
-        assert list(map(type, muted_topic_tuple)) == [str, str, int]
+    for stream_name, topic_name, date_muted in muted_topics:
+        assert type(stream_name) is str
+        assert type(topic_name) is str
+        assert type(date_muted) is int
 
 
 def check_legacy_presence(
@@ -463,22 +524,15 @@ def check_realm_update(
     assert prop == event["property"]
     value = event["value"]
 
-    if prop in [
-        "moderation_request_channel_id",
-        "new_stream_announcements_stream_id",
-        "signup_announcements_stream_id",
-        "zulip_update_announcements_stream_id",
-        "org_type",
-    ]:
+    if prop in REALM_INT_PROPERTIES:
         assert isinstance(value, int)
         return
 
-    property_type = Realm.property_types[prop]
-    if inspect.isclass(property_type) and issubclass(property_type, Enum):
+    if prop in REALM_ENUM_PROPERTY_TYPES:
         assert isinstance(value, str)
-        property_type[value]
+        REALM_ENUM_PROPERTY_TYPES[prop][value]
     else:
-        assert isinstance(value, property_type)
+        assert isinstance(value, REALM_OTHER_PROPERTY_TYPES[prop])
 
 
 def check_realm_default_update(
@@ -492,13 +546,23 @@ def check_realm_default_update(
     assert prop != "default_language"
     assert prop in RealmUserDefault.property_types
 
-    prop_type = RealmUserDefault.property_types[prop]
     value = event["value"]
-    if inspect.isclass(prop_type) and issubclass(prop_type, Enum):
+    if prop in REALM_DEFAULT_ENUM_PROPERTY_TYPES:
         assert isinstance(value, str)
-        prop_type[value]
+        REALM_DEFAULT_ENUM_PROPERTY_TYPES[prop][value]
     else:
-        assert isinstance(value, prop_type)
+        assert isinstance(value, REALM_DEFAULT_OTHER_PROPERTY_TYPES[prop])
+
+
+REALM_PERMISSION_GROUP_SETTING_NAMES = frozenset(Realm.REALM_PERMISSION_GROUP_SETTINGS)
+
+# Data types for update_dict properties other than "default", whose
+# type instead depends on which fields are present in the data.
+REALM_UPDATE_DICT_PROPERTY_TYPES: dict[str, type[BaseModel]] = dict(
+    icon=IconData,
+    logo=LogoData,
+    night_logo=NightLogoData,
+)
 
 
 def check_realm_update_dict(
@@ -508,34 +572,30 @@ def check_realm_update_dict(
 ) -> None:
     _check_realm_update_dict(var_name, event)
 
-    if event["property"] == "default":
-        assert isinstance(event["data"], dict)
+    prop = event["property"]
+    assert isinstance(prop, str)
+    assert isinstance(event["data"], dict)
 
-        if "allow_message_editing" in event["data"]:
+    if prop == "default":
+        keys = event["data"].keys()
+        if "allow_message_editing" in keys:
             sub_type: type[BaseModel] = AllowMessageEditingData
-        elif "message_content_edit_limit_seconds" in event["data"]:
+        elif "message_content_edit_limit_seconds" in keys:
             sub_type = MessageContentEditLimitSecondsData
-        elif "authentication_methods" in event["data"]:
+        elif "authentication_methods" in keys:
             sub_type = AuthenticationData
-        elif any(
-            setting_name in event["data"] for setting_name in Realm.REALM_PERMISSION_GROUP_SETTINGS
-        ):
+        elif not keys.isdisjoint(REALM_PERMISSION_GROUP_SETTING_NAMES):
             sub_type = GroupSettingUpdateData
-        elif "plan_type" in event["data"]:
+        elif "plan_type" in keys:
             sub_type = PlanTypeData
-        elif "topics_policy" in event["data"]:
+        elif "topics_policy" in keys:
             sub_type = RealmTopicsPolicyData
         else:
             raise AssertionError("unhandled fields in data")
-
-    elif event["property"] == "icon":
-        sub_type = IconData
-    elif event["property"] == "logo":
-        sub_type = LogoData
-    elif event["property"] == "night_logo":
-        sub_type = NightLogoData
+    elif prop in REALM_UPDATE_DICT_PROPERTY_TYPES:
+        sub_type = REALM_UPDATE_DICT_PROPERTY_TYPES[prop]
     else:
-        raise AssertionError("unhandled property: {event['property']}")
+        raise AssertionError(f"unhandled property: {prop}")
 
     validate_with_model(cast(dict[str, object], event["data"]), sub_type)
 
@@ -552,15 +612,8 @@ def check_realm_user_update(
     validate_with_model(cast(dict[str, object], event["person"]), sub_type)
 
 
-def check_stream_update(
-    var_name: str,
-    event: dict[str, object],
-) -> None:
-    _check_stream_update(var_name, event)
-    prop = event["property"]
-    value = event["value"]
-
-    extra_keys = set(event.keys()) - {
+STREAM_UPDATE_COMMON_KEYS = frozenset(
+    {
         "id",
         "type",
         "op",
@@ -572,6 +625,23 @@ def check_stream_update(
         "is_archived",
         "folder_id",
     }
+)
+
+USER_GROUP_MEMBERS_DICT_KEYS = (
+    UserGroupMembersDict.__required_keys__ | UserGroupMembersDict.__optional_keys__
+)
+STREAM_TOPICS_POLICY_NAMES = frozenset(e.name for e in StreamTopicsPolicyEnum)
+
+
+def check_stream_update(
+    var_name: str,
+    event: dict[str, object],
+) -> None:
+    _check_stream_update(var_name, event)
+    prop = event["property"]
+    value = event["value"]
+
+    extra_keys = event.keys() - STREAM_UPDATE_COMMON_KEYS
 
     if prop == "description":
         assert extra_keys == {"rendered_description"}
@@ -595,15 +665,13 @@ def check_stream_update(
         # We cannot validate a TypedDict using isinstance, thus
         # requiring this check.
         if isinstance(value, dict):
-            expected_keys = set(inspect.get_annotations(UserGroupMembersDict).keys())
-            keys = set(value.keys())
-            assert expected_keys == keys
+            assert value.keys() == USER_GROUP_MEMBERS_DICT_KEYS
     elif prop == "first_message_id":
         assert extra_keys == set()
         assert isinstance(value, int)
     elif prop == "topics_policy":
         assert extra_keys == set()
-        assert value in [e.name for e in StreamTopicsPolicyEnum]
+        assert value in STREAM_TOPICS_POLICY_NAMES
     elif prop == "is_recently_active":
         assert extra_keys == set()
         assert isinstance(value, bool)
@@ -665,13 +733,11 @@ def check_user_settings_update(
     assert isinstance(setting_name, str)
     if setting_name == "timezone":
         assert isinstance(value, str)
+    elif setting_name in USER_ENUM_PROPERTY_TYPES:
+        assert isinstance(value, str)
+        USER_ENUM_PROPERTY_TYPES[setting_name][value]
     else:
-        setting_type = UserProfile.property_types[setting_name]
-        if inspect.isclass(setting_type) and issubclass(setting_type, Enum):
-            assert isinstance(value, str)
-            setting_type[value]
-        else:
-            assert isinstance(value, setting_type)
+        assert isinstance(value, USER_OTHER_PROPERTY_TYPES[setting_name])
 
     if setting_name == "default_language":
         assert "language_name" in event
@@ -698,6 +764,33 @@ def check_update_global_notifications(
     assert isinstance(setting, setting_type)
 
 
+UPDATE_MESSAGE_BASE_KEYS = frozenset(
+    {
+        "id",
+        "type",
+        "user_id",
+        "edit_timestamp",
+        "message_id",
+        "flags",
+        "message_ids",
+        "rendering_only",
+    }
+)
+UPDATE_MESSAGE_STREAM_KEYS = frozenset({"stream_id", "stream_name"})
+UPDATE_MESSAGE_CONTENT_KEYS = frozenset(
+    {
+        "is_me_message",
+        "orig_content",
+        "orig_rendered_content",
+        "content",
+        "rendered_content",
+    }
+)
+UPDATE_MESSAGE_TOPIC_KEYS = frozenset({"topic_links", ORIG_TOPIC, TOPIC_NAME, "propagate_mode"})
+UPDATE_MESSAGE_NEW_STREAM_KEYS = frozenset({"new_stream_id", ORIG_TOPIC, "propagate_mode"})
+UPDATE_MESSAGE_EMBEDDED_KEYS = frozenset({"content", "rendered_content"})
+
+
 def check_update_message(
     var_name: str,
     event: dict[str, object],
@@ -710,59 +803,28 @@ def check_update_message(
     # Always check the basic schema first.
     _check_update_message(var_name, event)
 
-    actual_keys = set(event.keys())
-    expected_keys = {
-        "id",
-        "type",
-        "user_id",
-        "edit_timestamp",
-        "message_id",
-        "flags",
-        "message_ids",
-        "rendering_only",
-    }
+    expected_keys = UPDATE_MESSAGE_BASE_KEYS
 
     if is_stream_message:
-        expected_keys |= {
-            "stream_id",
-            "stream_name",
-        }
+        expected_keys |= UPDATE_MESSAGE_STREAM_KEYS
 
     if has_content:
-        expected_keys |= {
-            "is_me_message",
-            "orig_content",
-            "orig_rendered_content",
-            "content",
-            "rendered_content",
-        }
+        expected_keys |= UPDATE_MESSAGE_CONTENT_KEYS
 
     if has_topic:
-        expected_keys |= {
-            "topic_links",
-            ORIG_TOPIC,
-            TOPIC_NAME,
-            "propagate_mode",
-        }
+        expected_keys |= UPDATE_MESSAGE_TOPIC_KEYS
 
     if has_new_stream_id:
-        expected_keys |= {
-            "new_stream_id",
-            ORIG_TOPIC,
-            "propagate_mode",
-        }
+        expected_keys |= UPDATE_MESSAGE_NEW_STREAM_KEYS
 
     if is_embedded_update_only:
-        expected_keys |= {
-            "content",
-            "rendered_content",
-        }
+        expected_keys |= UPDATE_MESSAGE_EMBEDDED_KEYS
         assert event["user_id"] is None
     else:
         assert isinstance(event["user_id"], int)
 
     assert event["rendering_only"] == is_embedded_update_only
-    assert expected_keys == actual_keys
+    assert event.keys() == expected_keys
 
 
 def check_user_group_update(var_name: str, event: dict[str, object], fields: set[str]) -> None:
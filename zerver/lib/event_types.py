@@ -2,7 +2,7 @@ from typing import Annotated, Literal
 
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
-from pydantic import AfterValidator, BaseModel
+from pydantic import AfterValidator, BaseModel, ConfigDict
 
 from zerver.lib.types import UserGroupMembersDict
 
@@ -19,6 +19,10 @@ Url = Annotated[str, AfterValidator(check_url)]
 
 
 class BaseEvent(BaseModel):
+    # Events must not carry fields beyond those declared by their
+    # type; pydantic rejects any extras while validating.
+    model_config = ConfigDict(extra="forbid")
+
     id: int
 
 